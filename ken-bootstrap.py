@@ -12,7 +12,9 @@ Example:
     python ken-bootstrap.py core/kenning-parser --task "implement the frame parser"
 
 Requirements:
+    Python 3.10+
     pip install anthropic
+    pip install h2             # optional, HTTP/2 for --parallel
     export ANTHROPIC_API_KEY=your-key
 """
 
@@ -20,8 +22,10 @@ import argparse
 import os
 import re
 import sys
+import time
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from datetime import datetime
+from itertools import chain
 from pathlib import Path
 
 
@@ -29,54 +33,199 @@ from pathlib import Path
 # Data Structures
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Frame:
     number: int
     title: str
     prompt: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Kenning:
     path: str
-    frames: list[Frame]
+    frames: tuple[Frame, ...]
+    independent: bool = False
 
 
 # ============================================================================
 # Kenning Parser (Minimal)
 # ============================================================================
 
+PATH_RE = re.compile(r'# Kenning:\s*(.+)$')
+FRAME_HEADER_RE = re.compile(r'## Frame (\d+):[ \t]*(.*)')
+SECTION_RE = re.compile(r'## (?:Task|Reflection|Meta)\b')
+META_RE = re.compile(r'([\w-]+):\s*(.*)$')
+HR_RE = re.compile(r'---+\s*$')
+
+
+def make_frame(number: int, title: str, body: list[str]) -> Frame:
+    """Build a Frame from its header and collected body lines."""
+    return Frame(
+        number=number,
+        title=title,
+        prompt="".join(body).strip()
+    )
+
+
+def iter_frames(lines: Iterable[str]) -> Iterator[Frame]:
+    """Yield frames from kenning lines, one as soon as the next header is seen.
+
+    Only the current frame's lines are held in memory. Task, Reflection and
+    Meta sections end the current frame and are skipped.
+    """
+    
+    number = None
+    title = None
+    body = []
+    after_rule = False
+    
+    for line in lines:
+        # Cheap first-character dispatch: only lines starting with '#' can be
+        # headers and only lines starting with '-' can be rules, so ordinary
+        # body lines never reach the regex engine.
+        first = line[:1]
+        
+        if first == "#" and line.startswith("## "):
+            frame_match = FRAME_HEADER_RE.match(line)
+            
+            if frame_match or SECTION_RE.match(line):
+                if number is not None:
+                    yield make_frame(number, title, body)
+                
+                number = None
+                body = []
+                after_rule = False
+                
+                if frame_match:
+                    number = int(frame_match.group(1))
+                    title = frame_match.group(2).strip()
+                continue
+        
+        if number is None:
+            continue
+        
+        # A horizontal rule and any blank lines after it become one empty line
+        if first == "-" and HR_RE.match(line):
+            body.append("\n")
+            after_rule = True
+        elif not (after_rule and line.isspace()):
+            body.append(line)
+            after_rule = False
+    
+    if number is not None:
+        yield make_frame(number, title, body)
+
+
 def parse_kenning(filepath: str) -> Kenning:
     """Parse a kenning.md file into structured frames."""
     
     with open(filepath, 'r') as f:
-        content = f.read()
-    
-    # Extract ken path from first header
-    path_match = re.search(r'^# Kenning:\s*(.+)$', content, re.MULTILINE)
-    path = path_match.group(1).strip() if path_match else "unknown"
-    
-    # Find all frames
-    frame_pattern = r'## Frame (\d+):\s*(.+?)\n(.*?)(?=## Frame \d+:|## Task|## Reflection|## Meta|\Z)'
-    matches = re.findall(frame_pattern, content, re.DOTALL)
-    
-    frames = []
-    for num, title, prompt in matches:
-        # Clean up the prompt
-        prompt = prompt.strip()
-        # Remove horizontal rules
-        prompt = re.sub(r'^---+\s*$', '', prompt, flags=re.MULTILINE).strip()
+        lines = iter(f)
+        
+        # Read the ken path and the Meta block, which precede the frames
+        path = "unknown"
+        meta = {}
+        in_meta = False
+        for line in lines:
+            if line.startswith("## "):
+                if line.startswith("## Meta"):
+                    in_meta = True
+                    continue
+                lines = chain([line], lines)
+                break
+            
+            path_match = PATH_RE.match(line)
+            if path_match:
+                path = path_match.group(1).strip()
+            elif in_meta:
+                meta_match = META_RE.match(line)
+                if meta_match:
+                    meta[meta_match.group(1).lower()] = meta_match.group(2).strip()
         
-        frames.append(Frame(
-            number=int(num),
-            title=title.strip(),
-            prompt=prompt
-        ))
+        # Sort by frame number
+        frames = sorted(iter_frames(lines), key=lambda f: f.number)
+    
+    return Kenning(
+        path=path,
+        frames=tuple(frames),
+        independent=meta.get("independent", "").lower() == "true"
+    )
+
+
+# Soft per-frame budget; frames over it are flagged so authors can split them.
+FRAME_TOKEN_BUDGET = 1500
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return len(text) // 4
+
+
+def oversized_frames(kenning: Kenning, budget: int = FRAME_TOKEN_BUDGET) -> list[Frame]:
+    """Return frames whose prompt is estimated to exceed the token budget."""
+    return [frame for frame in kenning.frames if estimate_tokens(frame.prompt) > budget]
+
+
+def cache_dir() -> Path:
+    """Directory for parsed-kenning caches (honours XDG_CACHE_HOME)."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache"
+    return Path(base) / "ken"
+
+
+def load_kenning(filepath: str) -> Kenning:
+    """Parse a kenning, reusing a pickled copy when the file hasn't changed.
+
+    Each kenning has one cache file, named by its resolved path and overwritten
+    whenever the kenning changes. The file starts with a small header pickle of
+    the mtime_ns and size of both the kenning and this script. The Kenning
+    itself is only unpickled when that header still matches. Stamping the
+    script means any change to the parser invalidates every cached kenning,
+    with no version number to remember to bump.
+    
+    Only builtin types are pickled, so the cache works the same whether this
+    script runs as __main__ or is loaded under another module name. Any cache
+    problem falls back to a fresh parse.
+    """
+    import hashlib
+    import pickle
+    
+    st = os.stat(filepath)
+    parser_st = os.stat(__file__)
+    stamp = (st.st_mtime_ns, st.st_size, parser_st.st_mtime_ns, parser_st.st_size)
+    key = hashlib.sha1(os.path.realpath(filepath).encode()).hexdigest()
+    cache_path = cache_dir() / f"{key}.pkl"
     
-    # Sort by frame number
-    frames.sort(key=lambda f: f.number)
+    try:
+        with open(cache_path, 'rb') as f:
+            if pickle.load(f) == stamp:
+                path, independent, frames = pickle.load(f)
+                return Kenning(
+                    path=path,
+                    frames=tuple(Frame(*frame) for frame in frames),
+                    independent=independent
+                )
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable kenning cache {cache_path}: {e}")
+    
+    kenning = parse_kenning(filepath)
+    
+    # Write atomically so a concurrent run never reads a half-written pickle
+    try:
+        plain = (
+            kenning.path,
+            kenning.independent,
+            tuple((frame.number, frame.title, frame.prompt) for frame in kenning.frames)
+        )
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(pickle.dumps(stamp) + pickle.dumps(plain))
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Warning: Could not write kenning cache {cache_path}: {e}")
     
-    return Kenning(path=path, frames=frames)
+    return kenning
 
 
 # ============================================================================
@@ -97,7 +246,91 @@ def create_client():
         print("Error: ANTHROPIC_API_KEY environment variable not set")
         sys.exit(1)
     
-    return anthropic.Anthropic(api_key=api_key)
+    # Multiplex concurrent frame requests over one HTTP/2 connection when h2 is
+    # available. DefaultHttpxClient keeps the SDK's own timeouts and pool limits,
+    # which already reuse keep-alive connections.
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return anthropic.Anthropic(api_key=api_key)
+    
+    http_client = anthropic.DefaultHttpxClient(http2=True)
+    return anthropic.Anthropic(api_key=api_key, http_client=http_client)
+
+
+MODEL = "claude-sonnet-4-20250514"
+SEP = "=" * 60
+
+
+def user_message(text: str) -> dict:
+    """Build a user message as a content block list so it can carry cache_control."""
+    return {
+        "role": "user",
+        "content": [{"type": "text", "text": text}]
+    }
+
+
+def mark_cache_tail(messages: list[dict]):
+    """Move the prompt-cache breakpoint onto the most recent user block.
+
+    Only the tail carries the marker; Anthropic then serves everything before it
+    from the prompt cache on the next call. Older markers are stripped so we stay
+    well under the four-breakpoint limit.
+    
+    Since only the tail is ever marked, the previous marker can only sit on the
+    nearest earlier user message, so we stop there instead of rescanning the
+    whole conversation on every call.
+    """
+    for i in range(len(messages) - 2, -1, -1):
+        message = messages[i]
+        if message["role"] == "user":
+            for block in message["content"]:
+                block.pop("cache_control", None)
+            break
+    
+    messages[-1]["content"][-1]["cache_control"] = {"type": "ephemeral"}
+
+
+def send(client, messages: list[dict], max_tokens: int) -> str:
+    """Send the conversation with a cache breakpoint on its tail, return reply text."""
+    mark_cache_tail(messages)
+    
+    response = client.messages.create(
+        model=MODEL,
+        max_tokens=max_tokens,
+        messages=messages
+    )
+    
+    return response.content[0].text
+
+
+def send_streaming(client, messages: list[dict], max_tokens: int) -> str:
+    """Like send, but echo the reply to stdout as tokens arrive."""
+    mark_cache_tail(messages)
+    
+    with client.messages.stream(
+        model=MODEL,
+        max_tokens=max_tokens,
+        messages=messages
+    ) as stream:
+        for text in stream.text_stream:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        
+        reply = stream.get_final_message().content[0].text
+    
+    sys.stdout.write("\n")
+    return reply
+
+
+def frame_heading(frame: Frame) -> str:
+    """Banner printed before a frame."""
+    return f"\n{SEP}\nFrame {frame.number}: {frame.title}\n{SEP}\n"
+
+
+def frame_reply(frame: Frame, reply: str) -> str:
+    """A frame's reply followed by its completion marker."""
+    return f"{reply}\n\n[Frame {frame.number} complete]\n"
 
 
 def walk_frames(client, kenning: Kenning, verbose: bool = True) -> list[dict]:
@@ -107,35 +340,135 @@ def walk_frames(client, kenning: Kenning, verbose: bool = True) -> list[dict]:
     
     for frame in kenning.frames:
         if verbose:
-            print(f"\n{'='*60}")
-            print(f"Frame {frame.number}: {frame.title}")
-            print('='*60)
-            print(f"\n[Sending prompt...]\n")
+            sys.stdout.write(frame_heading(frame) + "\n[Sending prompt...]\n\n")
         
         # Add frame as user message
+        messages.append(user_message(frame.prompt))
+        
+        # Get response
+        assistant_message = send(client, messages, max_tokens=4096)
+        
+        # Add response to context
         messages.append({
-            "role": "user",
-            "content": frame.prompt
+            "role": "assistant", 
+            "content": assistant_message
         })
         
-        # Get response
+        if verbose:
+            sys.stdout.write(frame_reply(frame, assistant_message))
+    
+    return messages
+
+
+# Phrases that suggest a frame leans on earlier frames or the agent's replies to them.
+BACK_REFERENCE_RE = re.compile(
+    r'\b(as we saw|as (?:you|we) (?:said|noted|discussed)|previous frames?|'
+    r'earlier frames?|prior frames?|last frame|frame \d+|build(?:s|ing)? on|'
+    r'your (?:previous |earlier |last )?(?:answer|response)|above|'
+    r'earlier|from before|you (?:just|already)|you(?:\'ve| have)? (?:described|designed|built)|'
+    r'full context|order matters)\b',
+    re.IGNORECASE
+)
+
+
+def frames_are_independent(kenning: Kenning) -> bool:
+    """Check that a kenning may have its frames answered separately.
+
+    Frames build on each other by default, so the kenning has to opt in with
+    `independent: true` in its Meta block. The back-reference scan can only
+    veto that, never grant it.
+    """
+    if not kenning.independent:
+        return False
+    return not any(BACK_REFERENCE_RE.search(frame.prompt) for frame in kenning.frames)
+
+
+def walk_frames_batch(client, kenning: Kenning, verbose: bool = True) -> list[dict]:
+    """Walk independent frames as one Message Batch, then rebuild the context.
+
+    Each frame is answered on its own, so this only makes sense for kennings
+    whose frames don't build on each other. The responses are stitched into
+    the same user/assistant sequence walk_frames would have produced.
+    """
+    
+    requests = [
+        {
+            "custom_id": f"frame-{i}",
+            "params": {
+                "model": MODEL,
+                "max_tokens": 4096,
+                "messages": [user_message(frame.prompt)]
+            }
+        }
+        for i, frame in enumerate(kenning.frames)
+    ]
+    
+    batch = client.messages.batches.create(requests=requests)
+    
+    if verbose:
+        print(f"\n[Submitted batch {batch.id} with {len(requests)} frames]")
+    
+    # Poll with exponential backoff until the batch finishes
+    delay = 1.0
+    while batch.processing_status != "ended":
+        time.sleep(delay)
+        delay = min(delay * 2, 60.0)
+        batch = client.messages.batches.retrieve(batch.id)
+    
+    # Results can arrive in any order; custom_id carries each frame's position
+    responses = [None] * len(kenning.frames)
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            print(f"Error: Batch request {entry.custom_id} {entry.result.type}")
+            sys.exit(1)
+        responses[int(entry.custom_id.removeprefix("frame-"))] = entry.result.message.content[0].text
+    
+    return assemble_messages(kenning, responses, verbose)
+
+
+def walk_frames_parallel(client, kenning: Kenning, workers: int, verbose: bool = True) -> list[dict]:
+    """Walk independent frames concurrently, then rebuild the context.
+
+    Like walk_frames_batch, each frame is answered on its own; the requests
+    just go out over a thread pool instead of through the Batches API.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def ask(frame: Frame) -> str:
         response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=MODEL,
             max_tokens=4096,
-            messages=messages
+            messages=[user_message(frame.prompt)]
         )
-        
-        assistant_message = response.content[0].text
-        
-        # Add response to context
+        return response.content[0].text
+    
+    if verbose:
+        print(f"\n[Sending {len(kenning.frames)} frames across {workers} workers...]")
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = list(executor.map(ask, kenning.frames))
+    
+    return assemble_messages(kenning, responses, verbose)
+
+
+def assemble_messages(kenning: Kenning, responses: list[str], verbose: bool = True) -> list[dict]:
+    """Stitch per-frame responses into the user/assistant sequence walk_frames builds.
+
+    Responses are matched to frames by position, since frame numbers need not
+    be unique.
+    """
+    
+    messages = []
+    
+    for frame, assistant_message in zip(kenning.frames, responses):
+        messages.append(user_message(frame.prompt))
         messages.append({
-            "role": "assistant", 
+            "role": "assistant",
             "content": assistant_message
         })
         
         if verbose:
-            print(assistant_message)
-            print(f"\n[Frame {frame.number} complete]")
+            sys.stdout.write(frame_heading(frame) + "\n" + frame_reply(frame, assistant_message))
     
     return messages
 
@@ -144,9 +477,9 @@ def deliver_task(client, messages: list[dict], task: str, verbose: bool = True)
     """Deliver the task and get work response."""
     
     if verbose:
-        print(f"\n{'='*60}")
+        print(f"\n{SEP}")
         print("TASK")
-        print('='*60)
+        print(SEP)
         print(f"\n{task}\n")
     
     task_prompt = f"""## Task
@@ -156,28 +489,19 @@ def deliver_task(client, messages: list[dict], task: str, verbose: bool = True)
 Please complete this task based on the understanding you've built through our conversation.
 Provide your implementation, explanation, or solution."""
 
-    messages.append({
-        "role": "user",
-        "content": task_prompt
-    })
+    messages.append(user_message(task_prompt))
     
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=8192,
-        messages=messages
-    )
-    
-    work_response = response.content[0].text
+    if verbose:
+        print("\n[Agent working...]\n")
+        work_response = send_streaming(client, messages, max_tokens=8192)
+    else:
+        work_response = send(client, messages, max_tokens=8192)
     
     messages.append({
         "role": "assistant",
         "content": work_response
     })
     
-    if verbose:
-        print("\n[Agent working...]\n")
-        print(work_response)
-    
     return messages
 
 
@@ -185,9 +509,9 @@ def collect_reflection(client, messages: list[dict], verbose: bool = True) -> st
     """Prompt for and collect reflection."""
     
     if verbose:
-        print(f"\n{'='*60}")
+        print(f"\n{SEP}")
         print("REFLECTION")
-        print('='*60)
+        print(SEP)
     
     reflection_prompt = """## Reflection
 
@@ -203,40 +527,40 @@ Your work session is complete. Before this context clears, please reflect:
 
 Your reflection will be used to improve how future instances are prepared for this work."""
 
-    messages.append({
-        "role": "user",
-        "content": reflection_prompt
-    })
-    
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4096,
-        messages=messages
-    )
-    
-    reflection = response.content[0].text
+    messages.append(user_message(reflection_prompt))
     
     if verbose:
-        print(f"\n{reflection}")
+        print()
+        reflection = send_streaming(client, messages, max_tokens=4096)
+    else:
+        reflection = send(client, messages, max_tokens=4096)
     
     return reflection
 
 
+# Reflection directories already created by this process, so bulk saves skip mkdir.
+CREATED_DIRS: set[Path] = set()
+
+
 def save_reflection(ken_path: str, task: str, reflection: str, base_dir: str = "."):
     """Save reflection to file."""
+    from datetime import datetime
     
     # Create reflections directory
-    reflection_dir = Path(base_dir) / "reflections" / ken_path.replace("/", os.sep)
-    reflection_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Generate filename
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    reflection_dir = Path(base_dir, "reflections", *ken_path.split("/"))
+    if reflection_dir not in CREATED_DIRS:
+        reflection_dir.mkdir(parents=True, exist_ok=True)
+        CREATED_DIRS.add(reflection_dir)
+    
+    # Generate filename, using one clock reading for both name and metadata
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d-%H%M%S")
     filename = reflection_dir / f"{timestamp}.md"
     
     # Write reflection with metadata
     content = f"""# Reflection: {ken_path}
 
-**Timestamp**: {datetime.now().isoformat()}
+**Timestamp**: {now.isoformat()}
 **Task**: {task}
 
 ---
@@ -244,8 +568,10 @@ def save_reflection(ken_path: str, task: str, reflection: str, base_dir: str = "
 {reflection}
 """
     
-    with open(filename, 'w') as f:
-        f.write(content)
+    # Write via a temp file so an interrupted save never leaves a partial reflection
+    tmp_filename = filename.with_suffix(".md.tmp")
+    tmp_filename.write_text(content)
+    os.replace(tmp_filename, filename)
     
     return filename
 
@@ -254,6 +580,18 @@ def save_reflection(ken_path: str, task: str, reflection: str, base_dir: str = "
 # Main
 # ============================================================================
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value!r}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Ken Bootstrap - Minimal viable wake implementation",
@@ -275,6 +613,13 @@ The script will:
     parser.add_argument("--task", "-t", required=True, help="Task to accomplish")
     parser.add_argument("--kens-dir", default="kens", help="Directory containing kens")
     parser.add_argument("--quiet", "-q", action="store_true", help="Minimal output")
+    walk_mode = parser.add_mutually_exclusive_group()
+    walk_mode.add_argument("--batch", action="store_true",
+                           help="Walk frames as one Message Batch (half price, slower); "
+                                "needs 'independent: true' in the kenning's Meta block")
+    walk_mode.add_argument("--parallel", type=positive_int, metavar="K",
+                           help="Walk frames concurrently with K workers; "
+                                "needs 'independent: true' in the kenning's Meta block")
     
     args = parser.parse_args()
     
@@ -293,10 +638,14 @@ The script will:
         print(f"Kenning: {kenning_path}")
     
     # Parse kenning
-    kenning = parse_kenning(str(kenning_path))
+    kenning = load_kenning(str(kenning_path))
     
     if verbose:
         print(f"Loaded {len(kenning.frames)} frames")
+        
+        for frame in oversized_frames(kenning):
+            print(f"Warning: Frame {frame.number} is ~{estimate_tokens(frame.prompt)} tokens "
+                  f"(budget {FRAME_TOKEN_BUDGET}); consider splitting it into smaller frames")
     
     if not kenning.frames:
         print("Error: No frames found in kenning")
@@ -306,7 +655,21 @@ The script will:
     client = create_client()
     
     # Walk frames
-    messages = walk_frames(client, kenning, verbose)
+    if (args.batch or args.parallel) and not frames_are_independent(kenning):
+        if kenning.independent:
+            print("Warning: Frames refer back to earlier frames; walking them in order instead")
+        else:
+            print("Warning: Kenning doesn't declare 'independent: true' in its Meta block; "
+                  "walking frames in order instead")
+        args.batch = False
+        args.parallel = None
+    
+    if args.batch:
+        messages = walk_frames_batch(client, kenning, verbose)
+    elif args.parallel:
+        messages = walk_frames_parallel(client, kenning, args.parallel, verbose)
+    else:
+        messages = walk_frames(client, kenning, verbose)
     
     # Deliver task
     messages = deliver_task(client, messages, args.task, verbose)
@@ -318,9 +681,9 @@ The script will:
     reflection_file = save_reflection(args.ken_path, args.task, reflection)
     
     if verbose:
-        print(f"\n{'='*60}")
+        print(f"\n{SEP}")
         print(f"Session complete. Reflection saved to: {reflection_file}")
-        print('='*60)
+        print(SEP)
 
 
 if __name__ == "__main__":